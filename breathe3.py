@@ -8,8 +8,11 @@ Uses whisper.cpp for maximum CPU performance.
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import os
+import re
 import subprocess
 import threading
+import queue
+import mmap
 import tempfile
 from pathlib import Path
 import datetime
@@ -19,35 +22,56 @@ import json
 import urllib.request
 import platform
 
+# Optional in-process whisper.cpp bindings - keeps the model loaded across files
+try:
+    from pywhispercpp.model import Model as WhisperCppModel
+except ImportError:
+    WhisperCppModel = None
+
+# SRT cue timing line: "HH:MM:SS,mmm --> HH:MM:SS,mmm"
+TIME_RE = re.compile(r'(\d{2}):(\d{2}):(\d{2}),(\d{3}) --> (\d{2}):(\d{2}):(\d{2}),(\d{3})')
+
+# End timestamp of a whisper.cpp segment line: "[... --> HH:MM:SS.mmm]"
+SEGMENT_END_RE = re.compile(r'--> (\d{2}):(\d{2}):(\d{2})[.,](\d{3})\]')
+
+# ffmpeg silencedetect filter output
+SILENCE_START_RE = re.compile(r'silence_start: ([\d.]+)')
+SILENCE_END_RE = re.compile(r'silence_end: ([\d.]+)')
+
 class SpeedOptimizedConverter:
     def __init__(self, root):
         self.root = root
         self.root.title("🚀 Ultra-Fast Video to SRT Converter")
         self.root.geometry("800x700")
         
-        # Performance tracking
+        # Performance tracking (counters are shared across transcribe workers)
         self.start_time = None
         self.files_processed = 0
         self.total_files = 0
         self.processing_times = []
+        self._progress_lock = threading.Lock()
         
         # Supported video formats
         self.video_formats = {'.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm', '.m4v', '.mpg', '.mpeg'}
+        self._video_exts = frozenset(ext.lstrip('.') for ext in self.video_formats)
         
         # Speed mode configurations
         self.speed_configs = {
             'ultra_fast': {
                 'model': 'tiny',
+                'quant': 'q5_1',
                 'threads': os.cpu_count() or 4,
                 'chunk_length': 10,  # seconds
                 'temperature': 0.0,
                 'beam_size': 1,
                 'best_of': 1,
+                'no_fallback': True,
                 'no_speech_threshold': 0.3,
                 'compression_ratio_threshold': 2.4
             },
             'fast': {
                 'model': 'base', 
+                'quant': 'q5_1',
                 'threads': max(1, (os.cpu_count() or 4) - 1),
                 'chunk_length': 15,
                 'temperature': 0.1,
@@ -58,6 +82,7 @@ class SpeedOptimizedConverter:
             },
             'balanced': {
                 'model': 'small',
+                'quant': 'q8_0',
                 'threads': max(1, (os.cpu_count() or 4) - 2),
                 'chunk_length': 20,
                 'temperature': 0.2,
@@ -69,9 +94,25 @@ class SpeedOptimizedConverter:
         }
         
         # Current config
+        self.current_mode = 'fast'
         self.current_config = self.speed_configs['fast']
         self.processing = False
-        self.whisper_path = None
+        self.whisper_bin = None
+        self._active_processes = []
+
+        # Persistent in-process model (loaded once per batch, reused across files)
+        self._pw_model = None
+        self._pw_model_key = None
+
+        # Background model downloader
+        self._preload_thread = None
+
+        # P-core ids on hybrid CPUs, so whisper isn't held back by E-core stragglers
+        self.p_cores = self._detect_p_cores()
+
+        # whisper.cpp ggml model cache
+        self.model_cache_dir = Path.home() / '.cache' / 'whisper.cpp'
+        self.model_base_url = 'https://huggingface.co/ggerganov/whisper.cpp/resolve/main'
         
         # Languages
         self.languages = {
@@ -88,8 +129,11 @@ class SpeedOptimizedConverter:
             'Chinese': 'zh'
         }
         
+        # Log lines are queued and flushed in batches by a 100ms UI timer
+        self._log_queue = queue.SimpleQueue()
+
         self.setup_ui()
-        
+
     def setup_ui(self):
         # Main frame
         main_frame = ttk.Frame(self.root, padding="10")
@@ -162,8 +206,18 @@ class SpeedOptimizedConverter:
         
         # Remove existing
         self.remove_existing_var = tk.BooleanVar(value=True)
-        ttk.Checkbutton(options_frame, text="Overwrite existing SRT", 
+        ttk.Checkbutton(options_frame, text="Overwrite existing SRT",
                        variable=self.remove_existing_var).grid(row=1, column=2, pady=(5, 0), sticky=tk.W)
+
+        # Temperature fallback re-transcribes a segment up to 6x on clean audio it rarely helps
+        self.no_fallback_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(options_frame, text="Single-pass decode (no fallback retries)",
+                       variable=self.no_fallback_var).grid(row=2, column=0, columnspan=2, pady=(5, 0), sticky=tk.W)
+
+        # Cut silence before inference; SRT times are mapped back to the original
+        self.vad_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options_frame, text="Skip silent regions (VAD)",
+                       variable=self.vad_var).grid(row=2, column=2, pady=(5, 0), sticky=tk.W)
         
         # Progress and timing frame
         progress_frame = ttk.LabelFrame(main_frame, text="📊 Progress & Timing", padding="10")
@@ -225,22 +279,44 @@ class SpeedOptimizedConverter:
         self.root.rowconfigure(0, weight=1)
         
         # Initialize
+        self.root.after(100, self._flush_log)
         self.set_speed_mode('fast')
         self.check_setup()
-        
+
     def log_message(self, message, level="INFO"):
-        """Add message to log with timestamp and level"""
+        """Queue a log message with timestamp and level (safe from any thread)"""
         timestamp = datetime.datetime.now().strftime("%H:%M:%S")
         icons = {"INFO": "ℹ️", "SUCCESS": "✅", "WARNING": "⚠️", "ERROR": "❌", "SPEED": "🚀"}
         icon = icons.get(level, "ℹ️")
-        log_entry = f"[{timestamp}] {icon} {message}\n"
-        self.log_text.insert(tk.END, log_entry)
-        self.log_text.see(tk.END)
-        self.root.update_idletasks()
-        
+        self._log_queue.put(f"[{timestamp}] {icon} {message}")
+
+    def _flush_log(self):
+        """Drain queued log lines into the widget with a single insert"""
+        lines = []
+        while True:
+            try:
+                lines.append(self._log_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        if lines:
+            self.log_text.insert(tk.END, '\n'.join(lines) + '\n')
+            self.log_text.see(tk.END)
+
+        self.root.after(100, self._flush_log)
+
     def set_speed_mode(self, mode):
         """Set processing speed mode"""
+        self.current_mode = mode
         self.current_config = self.speed_configs[mode]
+
+        # Child env only changes with the mode, so build it once here
+        threads = str(self.current_config['threads'])
+        self._child_env = {**os.environ,
+                           'OMP_NUM_THREADS': threads,
+                           'MKL_NUM_THREADS': threads,
+                           'OPENBLAS_NUM_THREADS': threads}
+
         mode_names = {'ultra_fast': 'ULTRA FAST ⚡', 'fast': 'FAST 🏃', 'balanced': 'BALANCED ⚖️'}
         self.mode_var.set(f"Mode: {mode_names[mode]}")
         
@@ -259,46 +335,95 @@ class SpeedOptimizedConverter:
             self.log_message("❌ FFmpeg not found! Install with: sudo apt install ffmpeg", "ERROR")
             return False
         
-        # Check Whisper
-        try:
-            result = subprocess.run(['whisper', '--help'], capture_output=True, check=True)
-            self.whisper_path = 'whisper'
-            self.log_message("✅ Whisper CLI found and working", "SUCCESS")
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            self.log_message("⚠️ Whisper not found, attempting installation...", "WARNING")
-            if not self.install_whisper():
-                return False
-        
+        # Check whisper backend: in-process bindings first, CLI binary as fallback
+        self.whisper_bin = shutil.which('whisper-cli') or shutil.which('main')
+        if WhisperCppModel is not None:
+            self.log_message("✅ pywhispercpp bindings found (in-process, no subprocess per file)", "SUCCESS")
+        elif self.whisper_bin:
+            self.log_message(f"✅ whisper.cpp found: {self.whisper_bin}", "SUCCESS")
+        else:
+            self.log_message("❌ No whisper backend! Run 'pip install pywhispercpp' or put 'whisper-cli' on your PATH", "ERROR")
+            return False
+
+        if self.p_cores:
+            if WhisperCppModel is not None:
+                # In-process whisper runs in our own threads, so pin this process
+                if hasattr(os, 'sched_setaffinity'):
+                    try:
+                        os.sched_setaffinity(0, self.p_cores)
+                        self.log_message(f"📌 Hybrid CPU: pinned to {len(self.p_cores)} P-cores", "SPEED")
+                    except OSError:
+                        pass
+            else:
+                self.log_message(f"📌 Hybrid CPU: pinning whisper to {len(self.p_cores)} P-cores", "SPEED")
+
         # Pre-download models
         self.preload_models()
+
+        # Don't let a batch start against a model that is still downloading -
+        # both backends would otherwise fail on every single file
+        model_file = self.model_path(self.current_config['model'],
+                                     self.current_config.get('quant'))
+        if not (model_file.exists() and model_file.stat().st_size > 0):
+            self.log_message(f"⏳ Model '{model_file.stem}' is still downloading - try again in a moment", "WARNING")
+            return False
+
         return True
-        
-    def install_whisper(self):
-        """Install whisper if not found"""
+
+    def _detect_p_cores(self):
+        """List the performance-core CPU ids on hybrid Intel parts (Linux only)"""
         try:
-            self.log_message("📦 Installing OpenAI Whisper...", "INFO")
-            result = subprocess.run(['pip', 'install', 'openai-whisper'], 
-                                  capture_output=True, text=True, check=True)
-            self.log_message("✅ Whisper installed successfully!", "SUCCESS")
-            self.whisper_path = 'whisper'
-            return True
-        except subprocess.CalledProcessError as e:
-            self.log_message(f"❌ Failed to install Whisper: {e.stderr}", "ERROR")
-            return False
-            
+            with open('/sys/devices/cpu_core/cpus') as f:
+                spec = f.read().strip()
+        except OSError:
+            return None
+
+        cpus = []
+        for part in spec.split(','):
+            if '-' in part:
+                low, high = part.split('-')
+                cpus.extend(range(int(low), int(high) + 1))
+            elif part:
+                cpus.append(int(part))
+        return cpus or None
+
+    def model_path(self, model, quant=None):
+        """Path to a ggml model file in the local cache"""
+        name = f"ggml-{model}-{quant}.bin" if quant else f"ggml-{model}.bin"
+        return self.model_cache_dir / name
+
     def preload_models(self):
-        """Pre-download commonly used models"""
-        models_to_check = ['tiny', 'base', 'small']
+        """Check the model cache and fetch missing models in the background"""
         self.log_message("🔄 Checking/downloading Whisper models...", "INFO")
-        
-        for model in models_to_check:
+        self.model_cache_dir.mkdir(parents=True, exist_ok=True)
+
+        missing = []
+        for cfg in self.speed_configs.values():
+            model_file = self.model_path(cfg['model'], cfg.get('quant'))
+            if model_file.exists() and model_file.stat().st_size > 0:
+                self.log_message(f"✅ Model '{model_file.stem}' ready", "SUCCESS")
+            elif model_file not in missing:
+                missing.append(model_file)
+
+        # Download off the UI thread - a cold fetch is hundreds of MB
+        if missing and (self._preload_thread is None or not self._preload_thread.is_alive()):
+            self._preload_thread = threading.Thread(target=self._download_models,
+                                                    args=(missing,), daemon=True)
+            self._preload_thread.start()
+
+    def _download_models(self, model_files):
+        """Background worker: fetch ggml models, reporting through the log"""
+        for model_file in model_files:
             try:
-                # Test if model works by running a quick command
-                test_cmd = ['whisper', '--model', model, '--help']
-                subprocess.run(test_cmd, capture_output=True, check=True, timeout=10)
-                self.log_message(f"✅ Model '{model}' ready", "SUCCESS")
-            except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
-                self.log_message(f"📥 Model '{model}' will be downloaded on first use", "INFO")
+                self.log_message(f"📥 Downloading model '{model_file.stem}'...", "INFO")
+                tmp_file = model_file.with_suffix('.part')
+                url = f"{self.model_base_url}/{model_file.name}"
+                with urllib.request.urlopen(url, timeout=30) as response, open(tmp_file, 'wb') as out:
+                    shutil.copyfileobj(response, out)
+                os.replace(tmp_file, model_file)
+                self.log_message(f"✅ Model '{model_file.stem}' downloaded", "SUCCESS")
+            except Exception as e:
+                self.log_message(f"⚠️ Could not download model '{model_file.stem}': {str(e)}", "WARNING")
         
     def select_folder(self):
         """Open folder selection dialog"""
@@ -312,42 +437,91 @@ class SpeedOptimizedConverter:
         folder_path = self.folder_var.get()
         if not folder_path or not os.path.exists(folder_path):
             return
-            
-        video_files = self.find_video_files(folder_path)
+
+        # Walk the tree off the UI thread so big/network folders don't freeze the GUI
+        self.file_info_var.set("📂 Scanning...")
+        threading.Thread(target=self._scan_worker, args=(folder_path,), daemon=True).start()
+
+    def _scan_worker(self, folder_path):
+        """Background scan: find videos and total their size"""
+        video_files = []
+        total_size = 0
+        try:
+            video_files = self.find_video_files(folder_path)
+            for f in video_files:
+                try:
+                    total_size += f.stat().st_size
+                except OSError:
+                    pass  # deleted/unreadable between the walk and the stat
+        finally:
+            # Always report back, or the UI stays stuck on "Scanning..."
+            self.root.after(0, self._apply_scan_results, video_files, total_size / (1024*1024))
+
+    def _apply_scan_results(self, video_files, total_size):
+        """Publish scan results back on the UI thread"""
         self.total_files = len(video_files)
-        
+
         if video_files:
-            total_size = sum(f.stat().st_size for f in video_files) / (1024*1024)  # MB
             avg_size = total_size / len(video_files)
-            
+
             # Estimate time based on speed mode and file size
             time_per_mb = {'ultra_fast': 0.5, 'fast': 1.0, 'balanced': 2.0}
-            mode = next(k for k, v in self.speed_configs.items() if v == self.current_config)
-            estimated_minutes = (total_size * time_per_mb.get(mode, 1.0)) / 60
-            
+            estimated_minutes = (total_size * time_per_mb.get(self.current_mode, 1.0)) / 60
+
             self.file_info_var.set(f"📂 Found {len(video_files)} videos | {total_size:.1f}MB total | ~{estimated_minutes:.1f}min estimated")
             self.log_message(f"📊 Scan complete: {len(video_files)} files, avg {avg_size:.1f}MB each", "INFO")
+
+            # Warm the model's pages while the user is still looking at the scan
+            threading.Thread(target=self._prewarm_model, daemon=True).start()
         else:
             self.file_info_var.set("📂 No video files found")
             
+    def _prewarm_model(self):
+        """Ask the kernel to pre-fault the model file into the page cache"""
+        model_file = self.model_path(self.current_config['model'],
+                                     self.current_config.get('quant'))
+        if not model_file.exists():
+            return
+
+        try:
+            with open(model_file, 'rb') as f:
+                fd = f.fileno()
+                if hasattr(os, 'posix_fadvise'):
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+                    if hasattr(mmap, 'MADV_WILLNEED'):
+                        mapped.madvise(mmap.MADV_WILLNEED)
+        except (OSError, ValueError):
+            pass
+
     def find_video_files(self, folder_path):
         """Recursively find all video files"""
-        video_files = []
-        folder_path = Path(folder_path)
-        
-        for file_path in folder_path.rglob('*'):
-            if file_path.is_file() and file_path.suffix.lower() in self.video_formats:
-                video_files.append(file_path)
-                
-        return sorted(video_files)  # Sort for consistent processing order
+        video_exts = self._video_exts
+
+        def walk(path):
+            try:
+                entries = os.scandir(path)
+            except OSError:
+                return
+            # DirEntry caches the stat info, so is_dir/is_file cost no extra syscalls
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        yield from walk(entry.path)
+                    elif entry.is_file():
+                        name = entry.name
+                        dot = name.rfind('.')
+                        if dot != -1 and name[dot + 1:].lower() in video_exts:
+                            yield Path(entry.path)
+
+        return sorted(walk(folder_path))  # Sort for consistent processing order
         
     def estimate_file_time(self, file_path):
         """Estimate processing time for a single file"""
         try:
             file_size_mb = file_path.stat().st_size / (1024*1024)
-            mode = next(k for k, v in self.speed_configs.items() if v == self.current_config)
             time_per_mb = {'ultra_fast': 0.5, 'fast': 1.0, 'balanced': 2.0}
-            return file_size_mb * time_per_mb.get(mode, 1.0)
+            return file_size_mb * time_per_mb.get(self.current_mode, 1.0)
         except:
             return 60  # Default 1 minute if can't estimate
             
@@ -370,73 +544,384 @@ class SpeedOptimizedConverter:
         else:
             self.timing_var.set(f"⏱️ Elapsed: {elapsed_str}")
             
-    def process_video_optimized(self, video_path):
-        """Process single video with optimized settings"""
-        file_start_time = time.time()
-        
+    def get_model(self):
+        """Load the in-process whisper.cpp model once and reuse it across files"""
+        config = self.current_config
+        # No point running more threads than the P-cores we're pinned to
+        threads = config['threads']
+        if self.p_cores:
+            threads = min(threads, len(self.p_cores))
+
+        key = (self.current_mode, threads)
+        if self._pw_model is None or self._pw_model_key != key:
+            model_file = self.model_path(config['model'], config.get('quant'))
+            self.log_message(f"🧠 Loading model '{model_file.stem}' (once per batch)...", "INFO")
+
+            # Decode settings mirror what the CLI path passes via -bs/-bo/-nth
+            model_args = {
+                'n_threads': threads,
+                'temperature': config['temperature'],
+                'no_speech_thold': config['no_speech_threshold'],
+                'greedy': {'best_of': config['best_of']},
+            }
+            if config['beam_size'] > 1:
+                model_args['params_sampling_strategy'] = 1  # beam search
+                model_args['beam_search'] = {'beam_size': config['beam_size'],
+                                             'patience': -1.0}
+
+            self._pw_model = WhisperCppModel(str(model_file), **model_args)
+            self._pw_model_key = key
+        return self._pw_model
+
+    def transcribe_in_process(self, audio_wav, srt_path, show_progress=True):
+        """Transcribe with the persistent pywhispercpp model and write the SRT"""
+        model = self.get_model()
+
+        transcribe_args = {}
+        lang_code = self.languages.get(self.lang_var.get())
+        # The binding's default language is 'en'; empty string means auto-detect
+        transcribe_args['language'] = lang_code or ''
+        if self.translate_var.get():
+            transcribe_args['translate'] = True
+        if self.no_fallback_var.get() or self.current_config.get('no_fallback'):
+            transcribe_args['temperature_inc'] = 0.0
+        if show_progress:
+            transcribe_args['new_segment_callback'] = self._on_new_segment
+        # Let the Stop button interrupt mid-file, like terminate() on the CLI path
+        transcribe_args['abort_callback'] = lambda: not self.processing
+
+        segments = model.transcribe(str(audio_wav), **transcribe_args)
+
+        if not self.processing:
+            return False
+
+        self.write_srt(segments, srt_path)
+        return True
+
+    def transcribe_subprocess(self, audio_wav, video_path, worker_threads=None,
+                              show_progress=True):
+        """Transcribe by spawning the whisper-cli binary (fallback path)"""
+        cmd = [self.whisper_bin,
+               '-m', str(self.model_path(self.current_config['model'],
+                                         self.current_config.get('quant'))),
+               '-f', str(audio_wav)]
+
+        # Core settings
+        cmd.extend(['-osrt'])
+        cmd.extend(['-of', str(video_path.with_suffix(''))])
+        cmd.extend(['-t', str(worker_threads or self.current_config['threads'])])
+
+        # Speed optimizations
+        cmd.extend(['-bs', str(self.current_config['beam_size'])])
+        cmd.extend(['-bo', str(self.current_config['best_of'])])
+        cmd.extend(['-mc', '0'])
+        if self.no_fallback_var.get() or self.current_config.get('no_fallback'):
+            cmd.append('-nf')
+
+        # Pin to P-cores on hybrid CPUs so OMP barriers don't wait on E-cores
+        if self.p_cores and shutil.which('taskset'):
+            cmd = ['taskset', '-c', ','.join(map(str, self.p_cores))] + cmd
+
+        # Language settings; whisper-cli defaults to English, so auto-detect
+        # must be asked for explicitly
+        lang_code = self.languages.get(self.lang_var.get())
+        cmd.extend(['-l', lang_code or 'auto'])
+
+        if self.translate_var.get():
+            cmd.append('-tr')
+
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                 text=True, env=self._child_env)
+        self._active_processes.append(process)
+
         try:
-            self.log_message(f"🎬 Processing: {video_path.name}", "INFO")
-            
-            # Check if SRT exists
+            # Drain stdout as segments complete to drive the progress bar;
+            # stop_processing terminates the child from the UI thread
+            reader = threading.Thread(target=self._progress_reader,
+                                      args=(process.stdout, show_progress), daemon=True)
+            reader.start()
+            stderr = process.stderr.read()
+            process.wait()
+            reader.join()
+        finally:
+            self._active_processes.remove(process)
+
+        if not self.processing:
+            return False
+
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, cmd, stderr)
+
+        return True
+
+    def get_audio_duration(self, media_path):
+        """Duration in seconds via ffprobe (0 if it can't be determined)"""
+        cmd = ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+               '-of', 'json', str(media_path)]
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            return float(json.loads(result.stdout)['format']['duration'])
+        except Exception:
+            return 0
+
+    def _begin_file_progress(self, duration):
+        """Switch the per-file bar to determinate mode scaled to the audio length"""
+        def begin():
+            self.file_progress.stop()
+            if duration:
+                self.file_progress.configure(mode='determinate', maximum=duration, value=0)
+            else:
+                self.file_progress.configure(mode='indeterminate')
+                self.file_progress.start()
+        self.root.after(0, begin)
+
+    def _report_progress(self, seconds):
+        """Advance the per-file bar to the given position (from any thread)"""
+        self.root.after(0, lambda: self.file_progress.configure(value=seconds))
+
+    def _progress_reader(self, stream, report=True):
+        """Parse segment end timestamps from whisper-cli output as they complete
+
+        Always drains the pipe (so the child never blocks on a full buffer)
+        even when the shared progress bar isn't ours to update."""
+        for line in stream:
+            if not report:
+                continue
+            match = SEGMENT_END_RE.search(line)
+            if match:
+                hours, minutes, seconds, ms = map(int, match.groups())
+                self._report_progress(hours * 3600 + minutes * 60 + seconds + ms / 1000)
+
+    def _on_new_segment(self, segment):
+        """pywhispercpp callback: advance progress as each segment lands"""
+        self._report_progress(segment.t1 / 100)
+
+    def format_srt_time(self, centiseconds):
+        """Format a pywhispercpp timestamp (centiseconds) as SRT HH:MM:SS,mmm"""
+        ms = centiseconds * 10
+        hours, ms = divmod(ms, 3600000)
+        minutes, ms = divmod(ms, 60000)
+        seconds, ms = divmod(ms, 1000)
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d},{ms:03d}"
+
+    def write_srt(self, segments, srt_path):
+        """Serialize transcribed segments to an SRT file"""
+        with open(srt_path, 'w', encoding='utf-8') as f:
+            for i, segment in enumerate(segments, 1):
+                f.write(f"{i}\n")
+                f.write(f"{self.format_srt_time(segment.t0)} --> {self.format_srt_time(segment.t1)}\n")
+                f.write(f"{segment.text.strip()}\n\n")
+
+    def extract_audio(self, video_path, wav_path):
+        """Extract 16 kHz mono PCM audio (what whisper.cpp expects)"""
+        cmd = ['ffmpeg', '-y', '-i', str(video_path), '-vn',
+               '-ar', '16000', '-ac', '1', '-c:a', 'pcm_s16le', str(wav_path)]
+        subprocess.run(cmd, capture_output=True, check=True)
+
+    def _apply_vad(self, audio_wav):
+        """Cut silent regions before inference. Returns (wav, kept segments).
+
+        The kept segments double as the edit list used to map SRT times
+        back to the original timeline after transcription."""
+        total = self.get_audio_duration(audio_wav)
+        silences = self._detect_silences(audio_wav)
+        if not total or not silences:
+            return audio_wav, None
+
+        # Kept audio is the complement of the silent intervals
+        keeps = []
+        cursor = 0.0
+        for start, end in silences:
+            if start > cursor:
+                keeps.append((cursor, start))
+            cursor = max(cursor, end)
+        if cursor < total:
+            keeps.append((cursor, total))
+
+        removed = total - sum(end - start for start, end in keeps)
+        if not keeps or removed < 1.0:
+            return audio_wav, None  # not worth a second ffmpeg pass
+
+        trimmed_wav = audio_wav.with_name(audio_wav.stem + '_vad.wav')
+        try:
+            expr = '+'.join(f'between(t,{start:.3f},{end:.3f})' for start, end in keeps)
+            cmd = ['ffmpeg', '-y', '-i', str(audio_wav), '-af',
+                   f"aselect='{expr}',asetpts=N/SR/TB", str(trimmed_wav)]
+            subprocess.run(cmd, capture_output=True, check=True)
+        except Exception:
+            return audio_wav, None
+
+        audio_wav.unlink()
+        self.log_message(f"🔇 Skipped {removed:.1f}s of silence ({removed/total*100:.0f}%)", "SPEED")
+        return trimmed_wav, keeps
+
+    def _detect_silences(self, audio_wav):
+        """Find silent intervals with ffmpeg's silencedetect filter"""
+        cmd = ['ffmpeg', '-i', str(audio_wav), '-af',
+               'silencedetect=noise=-40dB:d=0.3', '-f', 'null', '-']
+        result = subprocess.run(cmd, capture_output=True, text=True)
+
+        silences = []
+        start = None
+        for line in result.stderr.splitlines():
+            match = SILENCE_START_RE.search(line)
+            if match:
+                start = float(match.group(1))
+                continue
+            match = SILENCE_END_RE.search(line)
+            if match and start is not None:
+                silences.append((start, float(match.group(1))))
+                start = None
+        if start is not None:
+            # File ends mid-silence
+            silences.append((start, self.get_audio_duration(audio_wav) or start))
+        return silences
+
+    def _map_srt_times(self, srt_path, keeps):
+        """Rewrite SRT timestamps from trimmed-audio time back to original time"""
+        edits = []
+        trimmed_pos = 0.0
+        for start, end in keeps:
+            edits.append((trimmed_pos, start, end - start))
+            trimmed_pos += end - start
+
+        def to_original(t):
+            for trimmed_start, orig_start, duration in reversed(edits):
+                if t >= trimmed_start:
+                    return orig_start + min(t - trimmed_start, duration)
+            return t
+
+        def remap(match):
+            groups = list(map(int, match.groups()))
+            times = []
+            for hours, minutes, seconds, milliseconds in (groups[:4], groups[4:]):
+                t = to_original(hours * 3600 + minutes * 60 + seconds + milliseconds / 1000)
+                ms = max(0, round(t * 1000))
+                hours, ms = divmod(ms, 3600000)
+                minutes, ms = divmod(ms, 60000)
+                seconds, ms = divmod(ms, 1000)
+                times.append(f"{hours:02d}:{minutes:02d}:{seconds:02d},{ms:03d}")
+            return f"{times[0]} --> {times[1]}"
+
+        try:
+            with open(srt_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            with open(srt_path, 'w', encoding='utf-8') as f:
+                f.write(TIME_RE.sub(remap, content))
+        except Exception as e:
+            self.log_message(f"⚠️ VAD time remap failed: {str(e)}", "WARNING")
+
+    def _extract_worker(self, video_files, wav_queue, n_workers=1):
+        """Producer thread: extract audio for upcoming files while transcription runs"""
+        for video_path in video_files:
+            if not self.processing:
+                return
+
             srt_path = video_path.with_suffix('.srt')
             if srt_path.exists() and not self.remove_existing_var.get():
-                self.log_message(f"⏭️ Skipping existing: {srt_path.name}", "INFO")
+                item = ('skip', video_path, None)
+            else:
+                # Unique temp name: recursive scans can yield same-stem videos
+                # in different subfolders, which must not share a WAV
+                fd, wav_name = tempfile.mkstemp(prefix=f"{video_path.stem}_16k_", suffix='.wav')
+                os.close(fd)
+                audio_wav = Path(wav_name)
+                try:
+                    self.extract_audio(video_path, audio_wav)
+                    vad_keeps = None
+                    if self.vad_var.get():
+                        audio_wav, vad_keeps = self._apply_vad(audio_wav)
+                    item = ('ok', video_path, (audio_wav, vad_keeps))
+                except Exception as e:
+                    if audio_wav.exists():
+                        audio_wav.unlink()
+                    item = ('error', video_path, str(e))
+
+            if not self._queue_put(wav_queue, item):
+                # Stopped mid-batch: nobody will consume this WAV
+                if item[0] == 'ok':
+                    audio_wav = item[2][0]
+                    if audio_wav.exists():
+                        audio_wav.unlink()
+                return
+
+        # One sentinel per consumer so every worker wakes up and exits
+        for _ in range(n_workers):
+            if not self._queue_put(wav_queue, None):
+                return
+
+    def _transcribe_worker(self, wav_queue, results, worker_threads, show_progress=True):
+        """Consumer thread: transcribe extracted WAVs pulled from the queue"""
+        while self.processing:
+            try:
+                item = wav_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            if item is None:
+                return
+
+            status, video_path, payload = item
+            succeeded = False
+            if status == 'skip':
+                self.log_message(f"⏭️ Skipping existing: {video_path.with_suffix('.srt').name}", "INFO")
+                succeeded = True
+            elif status == 'error':
+                self.log_message(f"❌ Audio extraction failed for {video_path.name}: {payload}", "ERROR")
+            else:
+                audio_wav, vad_keeps = payload
+                succeeded = self.process_video_optimized(video_path, audio_wav,
+                                                         worker_threads, vad_keeps,
+                                                         show_progress)
+
+            with self._progress_lock:
+                if succeeded:
+                    results['success'] += 1
+                self.files_processed += 1
+            self.update_timing_display()
+
+    def _queue_put(self, wav_queue, item):
+        """Put on the bounded queue without deadlocking if processing stops"""
+        while self.processing:
+            try:
+                wav_queue.put(item, timeout=0.5)
                 return True
-            
+            except queue.Full:
+                continue
+        return False
+
+    def process_video_optimized(self, video_path, audio_wav, worker_threads=None,
+                                vad_keeps=None, show_progress=True):
+        """Process single video with optimized settings"""
+        file_start_time = time.time()
+
+        try:
+            self.log_message(f"🎬 Processing: {video_path.name}", "INFO")
+
             # Remove existing if requested
-            if srt_path.exists() and self.remove_existing_var.get():
+            srt_path = video_path.with_suffix('.srt')
+            if srt_path.exists():
                 srt_path.unlink()
-                
-            # Build optimized whisper command
-            cmd = ['whisper', str(video_path)]
-            
-            # Core settings
-            cmd.extend(['--model', self.current_config['model']])
-            cmd.extend(['--output_format', 'srt'])
-            cmd.extend(['--output_dir', str(video_path.parent)])
-            cmd.extend(['--threads', str(self.current_config['threads'])])
-            
-            # Speed optimizations
-            cmd.extend(['--temperature', str(self.current_config['temperature'])])
-            cmd.extend(['--beam_size', str(self.current_config['beam_size'])])
-            cmd.extend(['--best_of', str(self.current_config['best_of'])])
-            cmd.extend(['--no_speech_threshold', str(self.current_config['no_speech_threshold'])])
-            cmd.extend(['--compression_ratio_threshold', str(self.current_config['compression_ratio_threshold'])])
-            
-            # Language settings
-            lang_code = self.languages.get(self.lang_var.get())
-            if lang_code:
-                cmd.extend(['--language', lang_code])
-                
-            if self.translate_var.get():
-                cmd.extend(['--task', 'translate'])
-                
-            # Advanced CPU optimizations
-            env = os.environ.copy()
-            env['OMP_NUM_THREADS'] = str(self.current_config['threads'])
-            env['MKL_NUM_THREADS'] = str(self.current_config['threads'])
-            
-            # Run whisper with progress tracking
-            self.current_file_var.set(f"🎬 Processing: {video_path.name}")
-            self.file_progress.start()
-            
-            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, 
-                                     text=True, env=env)
-            
-            # Monitor process
-            while process.poll() is None and self.processing:
-                time.sleep(0.1)
-                self.root.update_idletasks()
-                
-            if not self.processing:
-                process.terminate()
-                return False
-                
-            stdout, stderr = process.communicate()
-            
-            if process.returncode != 0:
-                raise subprocess.CalledProcessError(process.returncode, cmd, stderr)
-                
+
+            # Run whisper with progress tracking scaled to the audio duration
+            # (parallel workers share one bar, so they leave it alone)
+            if show_progress:
+                self.current_file_var.set(f"🎬 Processing: {video_path.name}")
+                self._begin_file_progress(self.get_audio_duration(audio_wav))
+
+            if WhisperCppModel is not None:
+                # In-process model loaded once and reused across the batch
+                if not self.transcribe_in_process(audio_wav, srt_path, show_progress):
+                    return False
+            else:
+                if not self.transcribe_subprocess(audio_wav, video_path, worker_threads,
+                                                  show_progress):
+                    return False
+
+            # Map timestamps back to original time if silence was cut out
+            if vad_keeps and srt_path.exists():
+                self._map_srt_times(srt_path, vad_keeps)
+
             # Apply time offset if needed
             if self.offset_var.get() != 0 and srt_path.exists():
                 self.apply_time_offset(srt_path, self.offset_var.get())
@@ -457,57 +942,50 @@ class SpeedOptimizedConverter:
             self.log_message(f"❌ Unexpected error: {str(e)}", "ERROR")
             return False
         finally:
-            self.file_progress.stop()
-            
+            if show_progress:
+                self.file_progress.stop()
+            if audio_wav.exists():
+                audio_wav.unlink()
+
     def apply_time_offset(self, srt_path, offset_seconds):
         """Apply time offset to SRT file"""
         if offset_seconds == 0:
             return
             
+        offset_ms = round(offset_seconds * 1000)
+
+        def shift(match):
+            groups = list(map(int, match.groups()))
+            times = []
+            for hours, minutes, seconds, milliseconds in (groups[:4], groups[4:]):
+                ms = hours * 3600000 + minutes * 60000 + seconds * 1000 + milliseconds
+                ms = max(0, ms + offset_ms)
+
+                hours, ms = divmod(ms, 3600000)
+                minutes, ms = divmod(ms, 60000)
+                seconds, ms = divmod(ms, 1000)
+                times.append(f"{hours:02d}:{minutes:02d}:{seconds:02d},{ms:03d}")
+            return f"{times[0]} --> {times[1]}"
+
         try:
-            with open(srt_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            lines = content.split('\n')
-            modified_lines = []
-            
-            for line in lines:
-                if '-->' in line:
-                    parts = line.strip().split(' --> ')
-                    if len(parts) == 2:
-                        start_time = self.adjust_time(parts[0], offset_seconds)
-                        end_time = self.adjust_time(parts[1], offset_seconds)
-                        modified_lines.append(f"{start_time} --> {end_time}")
-                    else:
-                        modified_lines.append(line)
-                else:
-                    modified_lines.append(line)
-            
-            with open(srt_path, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(modified_lines))
-                
+            # Stream line-by-line into a temp file, then swap it in atomically
+            tmp = tempfile.NamedTemporaryFile('w', encoding='utf-8',
+                                              dir=srt_path.parent, delete=False)
+            try:
+                with tmp, open(srt_path, 'r', encoding='utf-8') as src:
+                    for line in src:
+                        if '-->' in line:
+                            line = TIME_RE.sub(shift, line)
+                        tmp.write(line)
+                os.replace(tmp.name, srt_path)
+            except Exception:
+                os.unlink(tmp.name)
+                raise
+
         except Exception as e:
             self.log_message(f"⚠️ Time offset failed: {str(e)}", "WARNING")
-    
-    def adjust_time(self, time_str, offset_seconds):
-        """Adjust SRT time format"""
-        try:
-            time_part, ms_part = time_str.split(',')
-            hours, minutes, seconds = map(int, time_part.split(':'))
-            milliseconds = int(ms_part)
-            
-            total_seconds = hours * 3600 + minutes * 60 + seconds + milliseconds / 1000
-            total_seconds = max(0, total_seconds + offset_seconds)
-            
-            hours = int(total_seconds // 3600)
-            minutes = int((total_seconds % 3600) // 60)
-            seconds_int = int(total_seconds % 60)
-            milliseconds = int((total_seconds % 1) * 1000)
-            
-            return f"{hours:02d}:{minutes:02d}:{seconds_int:02d},{milliseconds:03d}"
-        except:
-            return time_str
-            
+
+
     def process_videos(self):
         """Main processing function with timing"""
         try:
@@ -527,20 +1005,59 @@ class SpeedOptimizedConverter:
             self.start_time = time.time()
             
             self.log_message(f"🚀 Starting batch processing: {len(video_files)} files", "INFO")
-            
-            success_count = 0
-            
-            for i, video_path in enumerate(video_files):
-                if not self.processing:
-                    self.log_message("⏹️ Processing stopped by user", "WARNING")
+
+            # Two whisper processes at half threads each beat one process at
+            # full threads for the small models; bigger models need the cache
+            if WhisperCppModel is None and self.current_config['model'] in ('tiny', 'base'):
+                n_workers = min(2, len(video_files))
+            else:
+                n_workers = 1
+
+            # Split whatever taskset will actually pin to, not the raw core count
+            total_cpus = len(self.p_cores) if self.p_cores else (os.cpu_count() or 4)
+            if n_workers > 1:
+                worker_threads = max(1, total_cpus // n_workers)
+                self.log_message(f"👥 Using {n_workers} workers with {worker_threads} threads each", "SPEED")
+                # One shared bar can't track two files, so run it indeterminate
+                self.current_file_var.set(f"🎬 Processing with {n_workers} parallel workers...")
+                self._begin_file_progress(0)
+            else:
+                worker_threads = min(self.current_config['threads'], total_cpus)
+
+            # Pipeline: extract audio for upcoming files while workers transcribe
+            wav_queue = queue.Queue(maxsize=n_workers + 1)
+            extractor = threading.Thread(target=self._extract_worker,
+                                         args=(video_files, wav_queue, n_workers), daemon=True)
+            extractor.start()
+
+            results = {'success': 0}
+            workers = []
+            for _ in range(n_workers):
+                worker = threading.Thread(target=self._transcribe_worker,
+                                          args=(wav_queue, results, worker_threads,
+                                                n_workers == 1), daemon=True)
+                worker.start()
+                workers.append(worker)
+
+            for worker in workers:
+                worker.join()
+
+            # A Stop abandons anything still queued - unlink those WAVs
+            while True:
+                try:
+                    item = wav_queue.get_nowait()
+                except queue.Empty:
                     break
-                    
-                if self.process_video_optimized(video_path):
-                    success_count += 1
-                    
-                self.files_processed += 1
-                self.update_timing_display()
-                    
+                if item is not None and item[0] == 'ok':
+                    audio_wav = item[2][0]
+                    if audio_wav.exists():
+                        audio_wav.unlink()
+
+            success_count = results['success']
+
+            if not self.processing:
+                self.log_message("⏹️ Processing stopped by user", "WARNING")
+
             total_time = time.time() - self.start_time
             avg_speed = sum(self.processing_times) / len(self.processing_times) if self.processing_times else 0
             
@@ -592,6 +1109,11 @@ class SpeedOptimizedConverter:
     def stop_processing(self):
         """Stop processing and save partial results"""
         self.processing = False
+        for process in list(self._active_processes):
+            try:
+                process.terminate()
+            except OSError:
+                pass
         self.log_message("🛑 Stopping processing... Saving partial results", "WARNING")
         
     def reset_ui(self):
@@ -619,13 +1141,14 @@ def check_dependencies():
         print("❌ FFmpeg not found! Install with: sudo apt install ffmpeg")
         return False
     
-    # Check for whisper CLI (don't import Python modules)
-    try:
-        subprocess.run(['whisper', '--help'], capture_output=True, check=True)
-        print("✅ Whisper CLI found")
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("⚠️ Whisper CLI not found - will be installed automatically")
-    
+    # Check for a whisper.cpp backend (bindings or CLI)
+    if WhisperCppModel is not None:
+        print("✅ pywhispercpp bindings found")
+    elif shutil.which('whisper-cli') or shutil.which('main'):
+        print("✅ whisper.cpp CLI found")
+    else:
+        print("⚠️ No whisper backend - run 'pip install pywhispercpp' or put 'whisper-cli' on your PATH")
+
     return True
 
 def main():